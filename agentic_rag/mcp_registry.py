@@ -96,6 +96,7 @@ MCP_SERVERS: dict[str, McpServerSpec] = {
             "get_user",
             "list_tasks",
             "create_task",
+            "create_tasks",
             "get_tasks_for_users",
             "update_user",
             "update_task",
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import json
-import re
+from functools import lru_cache
 from typing import Literal
 
 from agentic_rag.mcp_registry import MCP_SERVERS, all_server_ids, routing_catalog_text
@@ -12,7 +12,24 @@ RouterMode = Literal["keyword", "llm", "hybrid", "all"]
 
 
 def _normalize(text: str) -> str:
-    return re.sub(r"\s+", " ", text.lower().strip())
+    # split() with no separator drops leading/trailing whitespace and collapses runs, like re.sub(r"\s+", " ", ...)
+    return " ".join(text.lower().split())
+
+
+def _build_keyword_rules() -> dict[str, tuple[tuple[tuple[str, ...], int], ...]]:
+    """Per server: ``(needles, weight)`` rules; a rule scores once if any of its needles occurs."""
+    rules: dict[str, tuple[tuple[tuple[str, ...], int], ...]] = {}
+    for sid, spec in MCP_SERVERS.items():
+        out: list[tuple[tuple[str, ...], int]] = [((kw,), 2 if " " in kw else 1) for kw in spec.keywords]
+        for hint in spec.tool_name_hints:
+            spaced = hint.replace("_", " ")
+            out.append(((spaced, hint) if spaced != hint else (hint,), 2))
+        rules[sid] = tuple(out)
+    return rules
+
+
+# MCP_SERVERS is static, so weights and hint variants are computed once instead of on every prompt.
+_KEYWORD_RULES = _build_keyword_rules()
 
 
 def route_servers_keyword(prompt: str, *, min_score: int = 1) -> list[str]:
@@ -20,19 +37,34 @@ def route_servers_keyword(prompt: str, *, min_score: int = 1) -> list[str]:
     text = _normalize(prompt)
     if not text:
         return []
-
-    scores: dict[str, int] = {sid: 0 for sid in MCP_SERVERS}
-    for sid, spec in MCP_SERVERS.items():
-        for kw in spec.keywords:
-            if kw in text:
-                scores[sid] += 2 if " " in kw else 1
-        for hint in spec.tool_name_hints:
-            if hint.replace("_", " ") in text or hint in text:
-                scores[sid] += 2
+    return list(_route_normalized(text, min_score))
+
+
+@lru_cache(maxsize=512)
+def _route_normalized(text: str, min_score: int) -> tuple[str, ...]:
+    """Scoring is pure, so retried / repeated prompts (keyed after normalization) skip the rule scan."""
+    scores: dict[str, int] = {}
+    for sid, rules in _KEYWORD_RULES.items():
+        score = 0
+        for needles, weight in rules:
+            for needle in needles:
+                if needle in text:
+                    score += weight
+                    break
+        scores[sid] = score
 
     ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
-    picked = [sid for sid, sc in ranked if sc >= min_score]
-    return picked
+    return tuple(sid for sid, sc in ranked if sc >= min_score)
+
+
+# The router's system prompt (including the catalog text) also depends only on MCP_SERVERS: build it once.
+_ROUTER_SYSTEM_PROMPT = (
+    "You route user questions to MCP backend servers. "
+    "Reply with JSON only: {\"servers\": [\"leave\"|\"users_tasks\"|\"vector\", ...]}. "
+    "Pick the smallest set that can answer the question. "
+    "Use multiple only if the question clearly needs them.\n\n"
+    f"Available backends:\n{routing_catalog_text()}"
+)
 
 
 async def route_servers_llm(
@@ -44,17 +76,10 @@ async def route_servers_llm(
     """Ask Ollama (JSON) which server ids apply."""
     import httpx
 
-    system = (
-        "You route user questions to MCP backend servers. "
-        "Reply with JSON only: {\"servers\": [\"leave\"|\"users_tasks\"|\"vector\", ...]}. "
-        "Pick the smallest set that can answer the question. "
-        "Use multiple only if the question clearly needs them.\n\n"
-        f"Available backends:\n{routing_catalog_text()}"
-    )
     payload = {
         "model": model,
         "messages": [
-            {"role": "system", "content": system},
+            {"role": "system", "content": _ROUTER_SYSTEM_PROMPT},
             {"role": "user", "content": prompt},
         ],
         "stream": False,
@@ -101,23 +126,14 @@ async def route_servers_async(
     llm_model: str = "qwen2.5:latest",
     ollama_base_url: str = "http://127.0.0.1:11434",
 ) -> list[str]:
-    if mode == "all":
-        return all_server_ids()
-
-    keyword_pick = route_servers_keyword(prompt)
-
-    if mode == "keyword":
-        return keyword_pick if keyword_pick else all_server_ids()
-
-    if mode == "llm":
-        llm_pick = await route_servers_llm(prompt, model=llm_model, ollama_base_url=ollama_base_url)
-        return llm_pick if llm_pick else all_server_ids()
-
-    # hybrid: keyword when confident; else LLM; fallback all
-    if len(keyword_pick) == 1:
-        return keyword_pick
-    if len(keyword_pick) >= 2:
-        return keyword_pick
+    if mode == "all" or mode == "keyword":
+        return route_servers(prompt, mode=mode)
+
+    # hybrid: keyword when any server matched; else LLM. llm: LLM only. Both fall back to all.
+    if mode != "llm":
+        keyword_pick = route_servers_keyword(prompt)
+        if keyword_pick:
+            return keyword_pick
 
     llm_pick = await route_servers_llm(prompt, model=llm_model, ollama_base_url=ollama_base_url)
     return llm_pick if llm_pick else all_server_ids()
@@ -21,6 +21,22 @@ Use only tools to fetch or change data; do not invent records.
 After tool results, answer clearly in plain English.
 If a tool errors, explain what failed and what the user can try next."""
 
+# Tool definitions per (selected servers, interpreter). The tools open their own MCP session per call,
+# so callers that run many queries in one process skip re-spawning servers just to list tools again.
+_TOOLS_CACHE: dict[tuple[tuple[str, ...], str], list[Any]] = {}
+
+
+async def _load_tools(selected: list[str], py: Path) -> list[Any]:
+    key = (tuple(selected), str(py))
+    tools = _TOOLS_CACHE.get(key)
+    if tools is None:
+        connections = build_stdio_connections(selected, python_exe=py)
+        client = MultiServerMCPClient(connections, tool_name_prefix=True)
+        tools = await client.get_tools()
+        if tools:
+            _TOOLS_CACHE[key] = tools
+    return tools
+
 
 async def run_agent_query(
     prompt: str,
@@ -55,9 +71,7 @@ async def run_agent_query(
     if verbose:
         print(f"[agentic_rag] selected MCP servers: {selected}", file=sys.stderr)
 
-    connections = build_stdio_connections(selected, python_exe=py)
-    client = MultiServerMCPClient(connections, tool_name_prefix=True)
-    tools = await client.get_tools()
+    tools = await _load_tools(selected, py)
 
     if verbose:
         print(f"[agentic_rag] loaded {len(tools)} tools", file=sys.stderr)
@@ -4,12 +4,16 @@ OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
 OLLAMA_LIBRARY_URL = os.getenv("OLLAMA_LIBRARY_URL", "https://ollama.com/api/tags")
 DB_PATH = os.getenv("LLM_SERVICE_DB_PATH", "llm_service.db")
 MCP_SERVER_1_URL = os.getenv("MCP_SERVER_1_URL", "http://127.0.0.1:8001/mcp")
-MCP_SERVER_2_URL = os.getenv("MCP_SERVER_2_URL", "http://127.0.0.1:8002/mcp")  # Scraper + Qdrant (optional)
+MCP_SERVER_2_URL = os.getenv("MCP_SERVER_2_URL", "http://127.0.0.1:8002/mcp").strip()  # Scraper + Qdrant (optional; empty disables)
+# Seconds the agent reuses the MCP tool list before asking the servers again
+MCP_TOOLS_TTL = float(os.getenv("MCP_TOOLS_TTL", "60"))
+# Comma-separated browser origins allowed by CORS (defaults to the Vite dev server of webui/)
+CORS_ORIGINS = [
+    o.strip() for o in os.getenv("CORS_ORIGINS", "http://localhost:5173,http://127.0.0.1:5173").split(",") if o.strip()
+]
 
 # System prompt for the MCP-powered agent (tool calling / database)
-SYSTEM_PROMPT = os.getenv(
-    "AGENT_SYSTEM_PROMPT",
-    """\
+_DEFAULT_SYSTEM_PROMPT = """\
 You are an AI assistant for Tool Calling. You MUST use the provided tools to answer; do not give generic or theoretical answers. Do NOT ask "would you like me to proceed?" or suggest steps—execute the tools and return the actual results.
 
 Record data can contain any fields (e.g. status, name, email); table schema is informational only. Use update_record or find_update_and_get_record with the fields to set (e.g. {"status": "inactive"}).
@@ -26,5 +30,6 @@ When the user asks for tables or schema: call list_tables, then get_table_schema
 When the user asks to create, alter, or delete a table: call create_table, alter_table, or drop_table. Do not reply with generic SQL.
 
 Always use the tools and return real data from the database. Never give generic SQL or hypothetical answers or ask for confirmation.
-""",
-).strip()
+""".strip()
+_system_prompt_override = os.environ.get("AGENT_SYSTEM_PROMPT")
+SYSTEM_PROMPT = _DEFAULT_SYSTEM_PROMPT if _system_prompt_override is None else _system_prompt_override.strip()
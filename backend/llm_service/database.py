@@ -1,43 +1,77 @@
-"""SQLite storage for active model and context prompt."""
+"""SQLite storage for active model and context prompt.
+
+The app owns one connection for its whole lifetime: ``init_db`` opens it from the FastAPI lifespan and
+``close_db`` disposes of it on shutdown. Writes are rare and serialized by ``_LOCK`` (single writer); WAL mode
+keeps readers in other processes unblocked while a write commits.
+"""
 import sqlite3
+import threading
 from pathlib import Path
 
 from config import DB_PATH
 
+# One long-lived connection shared by the event loop and FastAPI's threadpool; access is serialized by _LOCK.
+_CONN: sqlite3.Connection | None = None
+_LOCK = threading.Lock()
+# The settings table is tiny and only changes through set_setting: init_db loads it once, reads never touch disk.
+_SETTINGS_CACHE: dict[str, str | None] = {}
+
 
 def get_conn():
-    Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    global _CONN
+    if _CONN is None:
+        with _LOCK:
+            if _CONN is None:
+                Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+                conn.row_factory = sqlite3.Row
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA temp_store=MEMORY")
+                conn.execute("PRAGMA cache_size=-64000")
+                _CONN = conn
+    return _CONN
+
+
+def close_db() -> None:
+    """Close the shared connection (called on app shutdown)."""
+    global _CONN
+    with _LOCK:
+        if _CONN is not None:
+            _CONN.close()
+            _CONN = None
 
 
 def init_db():
+    """Open the shared connection, create the settings table and load it into memory."""
     conn = get_conn()
-    conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS settings (
-            key TEXT PRIMARY KEY,
-            value TEXT
+    with _LOCK:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS settings (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+            """
         )
-        """
-    )
-    conn.commit()
-    conn.close()
+        conn.commit()
+        _SETTINGS_CACHE.clear()
+        _SETTINGS_CACHE.update(conn.execute("SELECT key, value FROM settings").fetchall())
 
 
 def get_setting(key: str) -> str | None:
-    conn = get_conn()
-    row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
-    conn.close()
-    return row["value"] if row else None
+    return _SETTINGS_CACHE.get(key)
 
 
 def set_setting(key: str, value: str) -> None:
+    """Persist a setting; a no-op (no write, no commit) when the stored value is already ``value``."""
     conn = get_conn()
-    conn.execute(
-        "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
-        (key, value),
-    )
-    conn.commit()
-    conn.close()
+    with _LOCK:
+        if key in _SETTINGS_CACHE and _SETTINGS_CACHE[key] == value:
+            return
+        conn.execute(
+            "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+            (key, value),
+        )
+        conn.commit()
+        _SETTINGS_CACHE[key] = value
@@ -1,10 +1,10 @@
 """FastAPI app for LLM service (Ollama)."""
 import asyncio
-import json
 import logging
 import os
 from contextlib import asynccontextmanager
 
+import orjson
 from fastapi import FastAPI, HTTPException
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(process)d] %(levelname)s %(name)s: %(message)s")
@@ -14,18 +14,20 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 import database
-from config import OLLAMA_HOST
+from config import CORS_ORIGINS, OLLAMA_HOST
 from services.agent_service import get_mcp_tools, run_agent_query
-from services.mcp_client import call_mcp_execute_instruction  # optional: direct MCP call without agent
+from services.mcp_client import call_mcp_execute_instruction, close_mcp_session  # optional: direct MCP call without agent
 from services.ollama_client import (
-    get_running_models,
-    generate_response,
-    list_models,
-    load_model as ollama_load_model,
-    delete_model as ollama_delete_model,
-    pull_model_stream_sync,
+    aclose_async_client,
+    aclose_http_client,
+    adelete_model,
+    agenerate_response,
+    alist_models,
+    aload_model,
+    apull_model_stream,
+    ashow_model,
+    get_active_model_cached,
     search_library,
-    show_model,
 )
 
 
@@ -35,16 +37,29 @@ async def lifespan(app: FastAPI):
     logger.info("LLM Service starting (pid=%s)", pid)
     print(f"[LLM Service] starting pid={pid}", flush=True)
     database.init_db()
-    # Fetch and print MCP server capabilities before any query
-    try:
-        await get_mcp_tools()
+    # Fetch and print MCP server capabilities before any query; warm the running-model cache alongside
+    tools, _ = await asyncio.gather(
+        get_mcp_tools(),
+        asyncio.wait_for(get_active_model_cached(), timeout=10.0),
+        return_exceptions=True,
+    )
+    if isinstance(tools, Exception):
+        logger.warning("Could not load MCP capabilities at startup (is MCP server running?): %s", tools)
+        print(f"[LLM Service] MCP tools not available at startup: {tools}", flush=True)
+    else:
         print("[LLM Service] MCP capabilities loaded and printed above.", flush=True)
-    except Exception as e:
-        logger.warning("Could not load MCP capabilities at startup (is MCP server running?): %s", e)
-        print(f"[LLM Service] MCP tools not available at startup: {e}", flush=True)
-    yield
-    logger.info("LLM Service shutting down")
-    print("[LLM Service] shutting down", flush=True)
+    try:
+        yield
+    finally:
+        logger.info("LLM Service shutting down")
+        print("[LLM Service] shutting down", flush=True)
+        # One failing close must not skip the rest (the settings DB is closed last).
+        for close in (close_mcp_session, aclose_http_client, aclose_async_client):
+            try:
+                await close()
+            except Exception as e:
+                logger.warning("Shutdown: %s failed: %s", close.__name__, e)
+        database.close_db()
 
 
 app = FastAPI(
@@ -58,10 +73,11 @@ app = FastAPI(
 )
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=86400,  # let browsers cache preflights instead of an OPTIONS round-trip before each POST
 )
 
 
@@ -97,75 +113,36 @@ class PullRequest(BaseModel):
     model_config = {"json_schema_extra": {"examples": [{"model": "llama3.2"}]}}
 
 
-def _to_dict(obj):
-    if hasattr(obj, "model_dump"):
-        try:
-            return obj.model_dump(mode="json")  # ensures datetime, etc. are JSON-serializable
-        except TypeError:
-            return obj.model_dump()
-    if hasattr(obj, "__dict__"):
-        return {k: v for k, v in obj.__dict__.items() if not k.startswith("_")}
-    return obj if isinstance(obj, dict) else {}
-
-
-def _normalize_model(m):
-    """Ensure each model has both 'name' and 'model' for the frontend."""
-    d = _to_dict(m) if not isinstance(m, dict) else m
-    if not isinstance(d, dict):
-        return {"name": str(m), "model": str(m)}
-    name = d.get("name") or d.get("model") or ""
-    d["name"] = name
-    d["model"] = name
-    return d
-
-
 @app.get("/api/models", tags=["Models"])
-def api_list_models():
+async def api_list_models():
     """Returns list of locally available LLM models."""
     pid = os.getpid()
     logger.info("api_list_models called (pid=%s)", pid)
     print(f"[LLM Service] api_list_models called pid={pid}", flush=True)
     try:
-        resp = list_models()
-        models = None
-        if hasattr(resp, "models") and resp.models is not None:
-            models = [_normalize_model(m) for m in resp.models]
-        elif isinstance(resp, dict) and "models" in resp:
-            raw = resp["models"] or []
-            models = [_normalize_model(m) for m in raw]
-        if models is None:
-            models = []
-        return {"models": models}
+        return {"models": await alist_models()}
     except Exception as e:
         raise HTTPException(status_code=503, detail=str(e))
 
 
 @app.post("/api/models/load", tags=["Models"])
-def api_load_model(body: LoadModelRequest):
+async def api_load_model(body: LoadModelRequest):
     """Load or switch the active LLM model. May take time."""
     try:
-        return ollama_load_model(body.model)
+        return await aload_model(body.model)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+async def _resolve_active_model():
+    """Resolve active model from DB or first running model."""
+    return database.get_setting("active_model") or await get_active_model_cached()
+
+
 @app.get("/api/models/active", tags=["Models"])
-def api_active_model():
+async def api_active_model():
     """Returns the active (selected) LLM model name from DB, or currently running from Ollama."""
-    saved = database.get_setting("active_model")
-    if saved:
-        return {"active_model": saved}
-    try:
-        ps = get_running_models()
-        models = getattr(ps, "models", None) or []
-        if models:
-            m = models[0]
-            name = m.get("name") if isinstance(m, dict) else getattr(m, "name", None) or getattr(m, "model", None)
-            if name:
-                return {"active_model": name}
-    except Exception:
-        pass
-    return {"active_model": None}
+    return {"active_model": await _resolve_active_model() or None}
 
 
 @app.post("/api/models/active", tags=["Models"])
@@ -176,10 +153,10 @@ def api_set_active_model(body: LoadModelRequest):
 
 
 @app.delete("/api/models/{model_name:path}", tags=["Models"])
-def api_delete_model(model_name: str):
+async def api_delete_model(model_name: str):
     """Delete a model from local Ollama. Clears active model if it was the deleted one."""
     try:
-        result = ollama_delete_model(model_name)
+        result = await adelete_model(model_name)
         if database.get_setting("active_model") == model_name:
             database.set_setting("active_model", "")
         return result
@@ -200,28 +177,14 @@ async def api_library_search(q: str = ""):
 @app.post("/api/library/pull", tags=["Library"])
 async def api_library_pull(body: PullRequest):
     """Pull model from Ollama library; streams progress as NDJSON."""
-    queue = asyncio.Queue()
-    loop = asyncio.get_event_loop()
-
-    def run_pull():
+    async def gen():
+        # Native async stream: each progress chunk is written as soon as Ollama sends it, and a slow
+        # client simply stops us reading from Ollama (no producer thread, no queue).
         try:
-            for chunk in pull_model_stream_sync(body.model):
-                asyncio.run_coroutine_threadsafe(queue.put(("chunk", chunk)), loop).result()
+            async for chunk in apull_model_stream(body.model):
+                yield orjson.dumps(chunk) + b"\n"
         except Exception as e:
-            asyncio.run_coroutine_threadsafe(queue.put(("error", str(e))), loop).result()
-        asyncio.run_coroutine_threadsafe(queue.put(("done", None)), loop).result()
-
-    async def gen():
-        task = loop.run_in_executor(None, run_pull)
-        while True:
-            kind, payload = await queue.get()
-            if kind == "error":
-                yield json.dumps({"error": payload}) + "\n"
-                break
-            if kind == "done":
-                break
-            yield json.dumps(payload) + "\n"
-        await task
+            yield orjson.dumps({"error": str(e)}) + b"\n"
 
     return StreamingResponse(
         gen(),
@@ -231,22 +194,13 @@ async def api_library_pull(body: PullRequest):
 
 
 @app.get("/api/models/active/capabilities", tags=["Models"])
-def api_active_model_capabilities():
+async def api_active_model_capabilities():
     """Returns capabilities/info of the active model from Ollama show."""
-    saved = database.get_setting("active_model")
-    if not saved:
-        try:
-            ps = get_running_models()
-            models = getattr(ps, "models", None) or []
-            if models:
-                m = models[0]
-                saved = m.get("name") or m.get("model") if isinstance(m, dict) else getattr(m, "name", None) or getattr(m, "model", None)
-        except Exception:
-            pass
+    saved = await _resolve_active_model()
     if not saved:
         raise HTTPException(status_code=404, detail="No active model selected or loaded")
     try:
-        return show_model(saved)
+        return await ashow_model(saved)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -259,16 +213,7 @@ async def api_agent_query(body: AgentQueryRequest):
     """
     logger.info("Agent query received: %s", body.query[:200] if body.query else "(empty)")
     print(f"[LLM Service] POST /api/agent/query — query: {repr(body.query[:300])}", flush=True)
-    active = database.get_setting("active_model")
-    if not active:
-        try:
-            ps = get_running_models()
-            models = getattr(ps, "models", None) or []
-            if models:
-                m = models[0]
-                active = m.get("name") or m.get("model") if isinstance(m, dict) else getattr(m, "name", None) or getattr(m, "model", None)
-        except Exception:
-            pass
+    active = await _resolve_active_model()
     if not active:
         raise HTTPException(status_code=400, detail="No active model selected or loaded. Choose a model in the web UI.")
     try:
@@ -279,28 +224,13 @@ async def api_agent_query(body: AgentQueryRequest):
         raise HTTPException(status_code=503, detail=str(e))
 
 
-def _resolve_active_model():
-    """Resolve active model from DB or first running model."""
-    active = database.get_setting("active_model")
-    if not active:
-        try:
-            ps = get_running_models()
-            models = getattr(ps, "models", None) or []
-            if models:
-                m = models[0]
-                active = m.get("name") or m.get("model") if isinstance(m, dict) else getattr(m, "name", None) or getattr(m, "model", None)
-        except Exception:
-            pass
-    return active
-
-
 @app.post("/api/prompt", tags=["Prompt"])
 async def api_prompt(body: PromptRequest):
     """Send prompt to the agent; the agent parses intent and calls MCP tools when needed. No regex routing."""
     logger.info("Prompt received: %s", body.prompt[:200] if body.prompt else "(empty)")
     print(f"[LLM Service] POST /api/prompt — passing to agent (agent parses intent): {repr(body.prompt[:200])}", flush=True)
 
-    active = _resolve_active_model()
+    active = await _resolve_active_model()
     if not active:
         raise HTTPException(status_code=400, detail="No active model selected or loaded. Choose a model in the web UI.")
 
@@ -316,15 +246,27 @@ async def api_prompt(body: PromptRequest):
     context = database.get_setting("context_prompt") or ""
     try:
         if body.stream:
-            def stream_gen():
-                for chunk in generate_response(active, body.prompt, system=context or None, stream=True):
-                    yield json.dumps({"content": getattr(chunk.message, "content", "") or (chunk.get("message", {}).get("content", "") if isinstance(chunk, dict) else "")}) + "\n"
+            async def stream_gen():
+                chunks = aiter(await agenerate_response(active, body.prompt, system=context or None, stream=True))
+                first = await anext(chunks, None)
+                if first is None:
+                    return
+                # The chunk type is fixed for a whole stream, so pick the content accessor once.
+                if isinstance(first, dict):
+                    def content_of(c):
+                        return (c.get("message") or {}).get("content") or ""
+                else:
+                    def content_of(c):
+                        return c.message.content or ""
+                yield orjson.dumps({"content": content_of(first)}) + b"\n"
+                async for chunk in chunks:
+                    yield orjson.dumps({"content": content_of(chunk)}) + b"\n"
             return StreamingResponse(
                 stream_gen(),
                 media_type="application/x-ndjson",
                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
             )
-        resp = generate_response(active, body.prompt, system=context or None, stream=False)
+        resp = await agenerate_response(active, body.prompt, system=context or None)
         content = getattr(resp.message, "content", None) or (resp.get("message", {}).get("content", "") if isinstance(resp, dict) else "")
         return {"response": content, "model": active}
     except Exception as e:
@@ -349,3 +291,10 @@ def api_get_context():
 def health():
     """Service and Ollama host status."""
     return {"status": "ok", "ollama_host": OLLAMA_HOST}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # uvloop + httptools (both ship with uvicorn[standard]) cut per-iteration overhead on the NDJSON streams.
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
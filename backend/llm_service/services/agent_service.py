@@ -1,14 +1,21 @@
 """
-LlamaIndex MCP-powered agent: discovers tools from MCP server on each query.
+LlamaIndex MCP-powered agent: discovers tools from the MCP server(s), cached for MCP_TOOLS_TTL seconds.
 The agent parses the user prompt and decides which tools to invoke (no regex).
 Stream events (ToolCall, ToolCallResult) are used to log MCP tool invocations.
 """
+import asyncio
 import logging
+import time
 
-from config import MCP_SERVER_1_URL, MCP_SERVER_2_URL, SYSTEM_PROMPT
+from config import MCP_SERVER_1_URL, MCP_SERVER_2_URL, MCP_TOOLS_TTL, SYSTEM_PROMPT
 
 logger = logging.getLogger(__name__)
 
+# (loaded_at, tools) of the last successful discovery; refetches are serialized by _tools_lock.
+_tools_cache: tuple[float, list] | None = None
+_tools_lock = asyncio.Lock()
+_tools_logged = False
+
 
 def _tool_name_and_desc(tool) -> tuple[str, str]:
     """Get (name, description) from a LlamaIndex tool for logging."""
@@ -21,8 +28,27 @@ def _tool_name_and_desc(tool) -> tuple[str, str]:
     return (str(name), str(desc)[:200] if desc else "")
 
 
+def invalidate_mcp_tools() -> None:
+    """Drop the cached tool list so the next query rediscovers tools (e.g. after an MCP error)."""
+    global _tools_cache
+    _tools_cache = None
+
+
 async def get_mcp_tools():
-    """Load tools from MCP server(s). Uses MCP_SERVER_1_URL (DB) and, if set, MCP_SERVER_2_URL (scraper + Qdrant). Called on each agent query."""
+    """Load tools from MCP server(s). Uses MCP_SERVER_1_URL (DB) and, if set, MCP_SERVER_2_URL (scraper + Qdrant). Cached for MCP_TOOLS_TTL seconds."""
+    cached = _tools_cache
+    if cached is not None and time.monotonic() - cached[0] < MCP_TOOLS_TTL:
+        return cached[1]
+    async with _tools_lock:
+        # Another query may have refreshed the cache while we waited for the lock.
+        cached = _tools_cache
+        if cached is not None and time.monotonic() - cached[0] < MCP_TOOLS_TTL:
+            return cached[1]
+        return await _load_mcp_tools()
+
+
+async def _load_mcp_tools():
+    global _tools_cache, _tools_logged
     try:
         from llama_index.tools.mcp import aget_tools_from_mcp_url
     except ImportError:
@@ -31,22 +57,58 @@ async def get_mcp_tools():
         )
     tools = await aget_tools_from_mcp_url(MCP_SERVER_1_URL)
     logger.info("Loaded %s MCP tools from %s", len(tools), MCP_SERVER_1_URL)
-    if (MCP_SERVER_2_URL or "").strip():
+    if MCP_SERVER_2_URL:
         try:
             tools_2 = await aget_tools_from_mcp_url(MCP_SERVER_2_URL)
             tools = list(tools) + list(tools_2)
             logger.info("Loaded %s additional tools from %s (total %s)", len(tools_2), MCP_SERVER_2_URL, len(tools))
         except Exception as e:
             logger.warning("Could not load MCP server 2 tools from %s: %s", MCP_SERVER_2_URL, e)
-    names = []
-    for t in tools:
-        name, desc = _tool_name_and_desc(t)
-        names.append(name)
-        logger.info("MCP capability: %s — %s", name, desc or "(no description)")
-    print(f"[LLM Service] MCP server capabilities ({len(tools)} tools): {', '.join(names)}", flush=True)
+    if tools:
+        _tools_cache = (time.monotonic(), tools)
+    # Capabilities are listed once; TTL refreshes only log the counts above.
+    if not _tools_logged:
+        names = []
+        for t in tools:
+            name, desc = _tool_name_and_desc(t)
+            names.append(name)
+            logger.info("MCP capability: %s — %s", name, desc or "(no description)")
+        print(f"[LLM Service] MCP server capabilities ({len(tools)} tools): {', '.join(names)}", flush=True)
+        _tools_logged = bool(tools)
     return tools
 
 
+def _log_tool_call(event) -> None:
+    tool_name = getattr(event, "tool_name", None) or getattr(event, "name", "?")
+    tool_kwargs = getattr(event, "tool_kwargs", None) or getattr(event, "args", {})
+    logger.info("Agent calling tool: %s with %s", tool_name, tool_kwargs)
+    print(f"[LLM Service] Calling tool: {tool_name}", flush=True)
+
+
+def _log_tool_result(event) -> None:
+    tool_name = getattr(event, "tool_name", None) or getattr(event, "name", "?")
+    tool_output = str(getattr(event, "tool_output", None) or getattr(event, "output", ""))
+    out_preview = tool_output[:200] + ("..." if len(tool_output) > 200 else "")
+    logger.info("Tool %s returned: %s", tool_name, out_preview)
+    print(f"[LLM Service] Tool {tool_name} returned: {out_preview}", flush=True)
+
+
+_EVENT_HANDLERS: dict | None = None
+
+
+def _event_handlers() -> dict:
+    """Exact event type -> logger, resolved once; empty if this llama-index has no ToolCall events."""
+    global _EVENT_HANDLERS
+    if _EVENT_HANDLERS is None:
+        try:
+            from llama_index.core.agent.workflow import ToolCall, ToolCallResult
+        except ImportError:
+            _EVENT_HANDLERS = {}
+        else:
+            _EVENT_HANDLERS = {ToolCall: _log_tool_call, ToolCallResult: _log_tool_result}
+    return _EVENT_HANDLERS
+
+
 def _create_agent(tools, llm, system_prompt: str | None = None):
     """Build ReAct agent with tools, LLM, and optional system prompt (tool calling / database)."""
     from llama_index.core.agent.workflow import ReActAgent
@@ -94,25 +156,17 @@ async def run_agent_query(
     # Invoke agent with user message (agent decides tool use)
     handler = agent.run(message_content, ctx=ctx)
 
-    # Stream events: log ToolCall and ToolCallResult (MCP tools as they run)
     try:
-        from llama_index.core.agent.workflow import ToolCall, ToolCallResult
-    except ImportError:
-        ToolCall = ToolCallResult = None
-
-    if ToolCall is not None and ToolCallResult is not None:
-        async for event in handler.stream_events():
-            if verbose and type(event) == ToolCall:
-                tool_name = getattr(event, "tool_name", None) or getattr(event, "name", "?")
-                tool_kwargs = getattr(event, "tool_kwargs", None) or getattr(event, "args", {})
-                logger.info("Agent calling tool: %s with %s", tool_name, tool_kwargs)
-                print(f"[LLM Service] Calling tool: {tool_name}", flush=True)
-            elif verbose and type(event) == ToolCallResult:
-                tool_name = getattr(event, "tool_name", None) or getattr(event, "name", "?")
-                tool_output = getattr(event, "tool_output", None) or getattr(event, "output", "")
-                out_preview = str(tool_output)[:200] + ("..." if len(str(tool_output)) > 200 else "")
-                logger.info("Tool %s returned: %s", tool_name, out_preview)
-                print(f"[LLM Service] Tool {tool_name} returned: {out_preview}", flush=True)
-
-    response = await handler
+        # Stream events: log ToolCall and ToolCallResult (MCP tools as they run)
+        handlers = _event_handlers() if verbose else None
+        if handlers:
+            async for event in handler.stream_events():
+                log = handlers.get(type(event))
+                if log is not None:
+                    log(event)
+
+        response = await handler
+    except Exception:
+        invalidate_mcp_tools()  # a dead MCP session or changed toolset: rediscover on the next query
+        raise
     return str(response)
@@ -1,42 +1,106 @@
-"""Call MCP server (mcp_server_1) tools. Agent parses user prompt and invokes tools; no regex routing here."""
+"""Call MCP server (mcp_server_1) tools. Agent parses user prompt and invokes tools; no regex routing here.
+
+One MCP session is opened lazily on the app's event loop and reused by every call; it is
+re-established on failure and closed from the FastAPI lifespan via ``close_mcp_session``.
+"""
 import asyncio
-import json
+import contextlib
+import logging
+
+import orjson
 
 from config import MCP_SERVER_1_URL
 
+logger = logging.getLogger(__name__)
+
+_session = None  # mcp.ClientSession once initialized
+_session_task: asyncio.Task | None = None
+_session_stop: asyncio.Event | None = None
+_session_lock = asyncio.Lock()
 
-def _call_mcp_sync(instruction: str) -> dict:
-    """Run MCP client in anyio (blocking). Used from async FastAPI via run_in_executor."""
-    try:
-        import anyio
-        from mcp import ClientSession
-        from mcp.client.streamable_http import streamable_http_client
-    except ImportError:
-        return {"success": False, "error": "MCP client not installed (pip install mcp[cli])"}
 
-    async def _do():
+async def _hold_session(ready: asyncio.Future, stop: asyncio.Event) -> None:
+    """Own the MCP transport for its whole life (anyio scopes must be entered and exited in one task)."""
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamable_http_client
+
+    try:
         async with streamable_http_client(MCP_SERVER_1_URL) as (read_stream, write_stream, _):
             async with ClientSession(read_stream, write_stream) as session:
                 await session.initialize()
-                result = await session.call_tool("execute_instruction", arguments={"instruction": instruction})
-                if not result or not getattr(result, "content", None):
-                    return {"success": False, "error": "No response from MCP server"}
-                text_parts = []
-                for block in result.content:
-                    if getattr(block, "type", None) == "text" and getattr(block, "text", None):
-                        text_parts.append(block.text)
-                text = "\n".join(text_parts)
-                if not text:
-                    return {"success": False, "error": "Empty tool response"}
-                try:
-                    return json.loads(text)
-                except json.JSONDecodeError:
-                    return {"success": True, "raw": text}
-
-    return anyio.run(_do)
+                ready.set_result(session)
+                await stop.wait()
+    except Exception as e:
+        if not ready.done():
+            ready.set_exception(e)
+        else:
+            logger.warning("MCP session to %s closed: %s", MCP_SERVER_1_URL, e)
+    finally:
+        if not ready.done():
+            ready.cancel()
+
+
+def _session_alive() -> bool:
+    return _session is not None and _session_task is not None and not _session_task.done()
+
+
+async def _get_session():
+    global _session, _session_task, _session_stop
+    if _session_alive():
+        return _session
+    async with _session_lock:
+        if _session_alive():
+            return _session
+        ready = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+        task = asyncio.create_task(_hold_session(ready, stop))
+        _session = await ready
+        _session_task, _session_stop = task, stop
+        return _session
+
+
+async def close_mcp_session() -> None:
+    """Close the shared MCP session, if any (called on app shutdown and before reconnecting)."""
+    global _session, _session_task, _session_stop
+    task, stop = _session_task, _session_stop
+    _session = _session_task = _session_stop = None
+    if task is not None:
+        stop.set()
+        with contextlib.suppress(Exception):
+            await task
+
+
+def _result_to_dict(result) -> dict:
+    if not result or not getattr(result, "content", None):
+        return {"success": False, "error": "No response from MCP server"}
+    text_parts = []
+    for block in result.content:
+        if getattr(block, "type", None) == "text" and getattr(block, "text", None):
+            text_parts.append(block.text)
+    text = "\n".join(text_parts)
+    if not text:
+        return {"success": False, "error": "Empty tool response"}
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return {"success": True, "raw": text}
 
 
 async def call_mcp_execute_instruction(instruction: str) -> dict:
     """Call MCP server's execute_instruction tool. Returns result dict or error."""
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, _call_mcp_sync, instruction)
+    try:
+        import mcp  # noqa: F401
+    except ImportError:
+        return {"success": False, "error": "MCP client not installed (pip install mcp[cli])"}
+
+    for attempt in range(2):
+        try:
+            session = await _get_session()
+            result = await session.call_tool("execute_instruction", arguments={"instruction": instruction})
+            break
+        except Exception:
+            # Stale session (server restarted, stream dropped): reconnect once before giving up.
+            await close_mcp_session()
+            if attempt:
+                raise
+    return _result_to_dict(result)
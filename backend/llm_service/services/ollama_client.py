@@ -1,70 +1,71 @@
 """Ollama client wrapper and library fetch."""
+import asyncio
+import time
+
 import httpx
-from ollama import Client
+from ollama import AsyncClient
 
 from config import OLLAMA_HOST, OLLAMA_LIBRARY_URL
 
-
-def get_client() -> Client:
-    return Client(host=OLLAMA_HOST)
+_async_client: AsyncClient | None = None
+# Plain HTTP calls (Ollama /api/tags fallback, ollama.com library) share one keep-alive pool.
+_http_client: httpx.AsyncClient | None = None
 
 
-def _fetch_tags_http():
-    """GET /api/tags from Ollama (direct HTTP). Returns list of model dicts."""
-    with httpx.Client(timeout=10.0) as client:
-        base = OLLAMA_HOST.rstrip("/")
-        r = client.get(f"{base}/api/tags")
-        r.raise_for_status()
-        data = r.json()
-    return data.get("models") or []
+def get_async_client() -> AsyncClient:
+    """Shared async client, so handlers on the event loop reuse one connection pool."""
+    global _async_client
+    if _async_client is None:
+        # Concurrent streams (chat, pulls) each hold a connection; keep enough of them warm.
+        # Reads stay unbounded (model loads and long generations), but an unreachable host fails fast.
+        _async_client = AsyncClient(
+            host=OLLAMA_HOST,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=httpx.Timeout(None, connect=10.0),
+        )
+    return _async_client
 
 
-def list_models():
-    """List locally available models. Uses Python client; falls back to direct HTTP if needed."""
-    try:
-        resp = get_client().list()
-        if hasattr(resp, "models") and resp.models is not None:
-            return resp
-    except Exception:
-        pass
-    # Fallback: direct HTTP (e.g. client failed or returned empty)
-    models = _fetch_tags_http()
-    class _ListLike:
-        models = models
-    return _ListLike()
+async def aclose_async_client() -> None:
+    """Close the shared Ollama client (called on app shutdown)."""
+    global _async_client
+    if _async_client is not None:
+        # AsyncClient.close() only exists in newer ollama releases; close the wrapped httpx client directly.
+        client, _async_client = _async_client, None
+        await client._client.aclose()
 
 
-def load_model(model: str):
-    """Load/switch model (keeps it in memory). Runs a no-op generate to load."""
-    client = get_client()
-    client.generate(model=model, prompt="", stream=False)
-    return {"model": model, "status": "loaded"}
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(limits=httpx.Limits(max_keepalive_connections=32))
+    return _http_client
 
 
-def get_running_models():
-    """Currently loaded model(s) from Ollama."""
-    return get_client().ps()
+async def aclose_http_client() -> None:
+    """Close the shared HTTP client (called on app shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
 
 
-def delete_model(model: str):
-    """Remove a model from local Ollama."""
-    get_client().delete(model=model)
-    return {"model": model, "status": "deleted"}
+def _model_name(m) -> str | None:
+    if isinstance(m, dict):
+        return m.get("name") or m.get("model")
+    return getattr(m, "name", None) or getattr(m, "model", None)
 
 
-def pull_model_stream_sync(model: str):
-    """Sync generator: stream pull progress. Yields dicts with status, completed, total, etc."""
-    client = get_client()
-    for progress in client.pull(model=model, stream=True):
+async def apull_model_stream(model: str):
+    """Async generator: stream pull progress. Yields dicts with status, completed, total, etc."""
+    async for progress in await get_async_client().pull(model=model, stream=True):
         if hasattr(progress, "__dict__"):
             yield {"status": getattr(progress, "status", ""), "completed": getattr(progress, "completed", 0), "total": getattr(progress, "total", 0)}
         else:
             yield progress
 
 
-def show_model(model: str) -> dict:
-    """Get model info and capabilities from ollama show."""
-    info = get_client().show(model)
+def _show_to_dict(info) -> dict:
     if hasattr(info, "model_dump"):
         return info.model_dump()
     if hasattr(info, "__dict__"):
@@ -72,28 +73,119 @@ def show_model(model: str) -> dict:
     return dict(info) if info else {}
 
 
-def generate_response(model: str, prompt: str, system: str | None = None, stream: bool = False):
-    """Generate response from model. If stream=True, returns generator."""
-    client = get_client()
+def _chat_messages(prompt: str, system: str | None) -> list[dict]:
     if system:
-        messages = [
+        return [
             {"role": "system", "content": system},
             {"role": "user", "content": prompt},
         ]
-    else:
-        messages = [{"role": "user", "content": prompt}]
-    if stream:
-        return client.chat(model=model, messages=messages, stream=True)
-    return client.chat(model=model, messages=messages, stream=False)
+    return [{"role": "user", "content": prompt}]
+
+
+async def agenerate_response(model: str, prompt: str, system: str | None = None, stream: bool = False):
+    """Chat with ``model``. If stream=True, returns an async iterator of chat chunks."""
+    return await get_async_client().chat(model=model, messages=_chat_messages(prompt, system), stream=stream)
+
+
+async def _afetch_tags_http():
+    """Async GET /api/tags from Ollama (direct HTTP). Returns list of model dicts."""
+    r = await get_http_client().get(f"{OLLAMA_HOST.rstrip('/')}/api/tags", timeout=10.0)
+    r.raise_for_status()
+    return r.json().get("models") or []
+
+
+def _model_summary(m) -> dict:
+    """List-view fields of one local model; 'name' and 'model' are both set for the frontend."""
+    name = _model_name(m) or ""
+    if isinstance(m, dict):
+        return {"name": name, "model": name, "size": m.get("size"), "modified_at": m.get("modified_at"), "digest": m.get("digest")}
+    return {"name": name, "model": name, "size": m.size, "modified_at": m.modified_at, "digest": m.digest}
+
+
+async def alist_models() -> list[dict]:
+    """Locally available models, normalized with _model_summary: Python client first, direct HTTP fallback."""
+    try:
+        resp = await get_async_client().list()
+        if resp.models is not None:
+            return [_model_summary(m) for m in resp.models]
+    except Exception:
+        pass
+    return [_model_summary(m) for m in await _afetch_tags_http()]
+
+
+async def aload_model(model: str):
+    """Load/switch model (keeps it in memory). Runs a no-op generate to load."""
+    await get_async_client().generate(model=model, prompt="", stream=False)
+    invalidate_active_model()
+    return {"model": model, "status": "loaded"}
+
+
+async def aget_running_models():
+    """Currently loaded model(s) from Ollama."""
+    return await get_async_client().ps()
+
+
+async def adelete_model(model: str):
+    """Remove a model from local Ollama."""
+    await get_async_client().delete(model=model)
+    invalidate_active_model()
+    return {"model": model, "status": "deleted"}
+
+
+async def ashow_model(model: str) -> dict:
+    """Get model info and capabilities from ollama show."""
+    return _show_to_dict(await get_async_client().show(model))
+
+
+# Last answer of get_active_model_cached (negative results and failures are cached too).
+_active_model: str | None = None
+_active_model_checked_at = float("-inf")
+# In-flight refresh, shared by every caller that finds the cached answer stale.
+_active_model_refresh: asyncio.Task | None = None
+
+
+async def _refresh_active_model() -> None:
+    global _active_model, _active_model_checked_at
+    try:
+        models = getattr(await aget_running_models(), "models", None) or []
+        name = _model_name(models[0]) if models else None
+    except Exception:
+        name = _active_model  # Ollama unreachable: keep serving the last known name
+    if asyncio.current_task() is not _active_model_refresh:
+        return  # invalidated while in flight; a newer lookup owns the cache
+    _active_model = name
+    _active_model_checked_at = time.monotonic()
+
+
+def invalidate_active_model() -> None:
+    """Forget the cached running model (after a load or delete), so the next lookup asks Ollama."""
+    global _active_model, _active_model_checked_at, _active_model_refresh
+    _active_model = None
+    _active_model_checked_at = float("-inf")
+    _active_model_refresh = None
+
+
+async def get_active_model_cached(ttl: float = 5.0) -> str | None:
+    """Name of the first running model in Ollama, refreshed at most every ``ttl`` seconds.
+
+    Once an answer is cached, a stale one is returned immediately while a single background
+    refresh runs (stale-while-revalidate); if Ollama cannot be reached, the last known name is kept.
+    """
+    global _active_model_refresh
+    if time.monotonic() - _active_model_checked_at < ttl:
+        return _active_model
+    if _active_model_refresh is None or _active_model_refresh.done():
+        _active_model_refresh = asyncio.create_task(_refresh_active_model())
+    if _active_model_checked_at == float("-inf"):
+        await asyncio.shield(_active_model_refresh)  # nothing to serve yet
+    return _active_model
 
 
 async def search_library(query: str = "") -> list[dict]:
     """Search Ollama library (ollama.com). Optional query filters by name."""
-    async with httpx.AsyncClient() as client:
-        r = await client.get(OLLAMA_LIBRARY_URL)
-        r.raise_for_status()
-        data = r.json()
-    models = data.get("models") or []
+    r = await get_http_client().get(OLLAMA_LIBRARY_URL)
+    r.raise_for_status()
+    models = r.json().get("models") or []
     if query:
         q = query.lower()
         models = [m for m in models if q in (m.get("name") or "").lower()]
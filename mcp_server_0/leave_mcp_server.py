@@ -20,15 +20,20 @@ from __future__ import annotations
 import json
 import logging
 import os
-import re
 import sys
+import time
 import uuid
-from datetime import date, datetime
+from datetime import date
 from pathlib import Path
 from typing import Any
 
 from mcp.server.fastmcp import FastMCP
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 mcp = FastMCP("Employee Leave")
 
 # Fixed name so the same logger is used when run as ``python leave_mcp_server.py`` (__main__)
@@ -88,6 +93,16 @@ EMPLOYEES: dict[str, dict[str, Any]] = {
 
 _NAME_TO_ID = {info["name"].lower(): eid for eid, info in EMPLOYEES.items()}
 _ALIAS_TO_ID = {"alice": "EMP001", "bob": "EMP002", "carol": "EMP003"}
+# Every lowercase spelling resolve_employee_id accepts without a regex: ids (``emp001``, ``emp01``, ``emp1``),
+# first-name aliases and full names.
+_KEY_TO_ID = {
+    **{spelling: eid for eid in EMPLOYEES for spelling in (eid.lower(), f"emp0{eid[-1]}", f"emp{eid[-1]}")},
+    **_ALIAS_TO_ID,
+    **_NAME_TO_ID,
+}
+
+# Id number without padding -> id ("1" -> "EMP001"), for ``emp`` + any number of zeros + number.
+_NUMBER_TO_ID = {eid[3:].lstrip("0"): eid for eid in EMPLOYEES}
 
 _leaves: list[dict[str, Any]] = []
 
@@ -97,6 +112,13 @@ def _data_path() -> Path:
     return Path(raw).expanduser() if raw else _DEFAULT_DATA_PATH
 
 
+def _loads(raw: bytes) -> Any:
+    """Parse the store (orjson when installed, stdlib json otherwise); it is re-read on every tool call."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 def _load_from_disk() -> None:
     """Replace ``_leaves`` from the JSON store (empty list if missing or invalid)."""
     global _leaves
@@ -105,7 +127,7 @@ def _load_from_disk() -> None:
         _leaves = []
         return
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
+        data = _loads(path.read_bytes())
         if not isinstance(data, list):
             raise ValueError("root must be a JSON array")
         _leaves = data
@@ -125,6 +147,11 @@ def _save_to_disk() -> None:
     tmp.replace(path)
 
 
+def _now_iso() -> str:
+    """Local time to the second, e.g. ``2025-01-31T14:05:09``."""
+    return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+
 def _parse_date(value: str) -> date:
     value = value.strip()
     try:
@@ -134,23 +161,15 @@ def _parse_date(value: str) -> date:
 
 
 def resolve_employee_id(raw: str) -> str | None:
-    key = raw.strip()
-    if not key:
+    lower = raw.strip().lower()
+    if not lower:
         return None
-    upper = key.upper()
-    if upper in EMPLOYEES:
-        return upper
-    lower = key.lower()
-    m = re.fullmatch(r"emp0*([123])", lower)
-    if m:
-        return f"EMP00{int(m.group(1))}"
-    if lower in _ALIAS_TO_ID:
-        return _ALIAS_TO_ID[lower]
-    if lower in _NAME_TO_ID:
-        return _NAME_TO_ID[lower]
-    for eid, info in EMPLOYEES.items():
-        if info["name"].lower() == lower:
-            return eid
+    eid = _KEY_TO_ID.get(lower)
+    if eid is not None:
+        return eid
+    # Unusual zero padding, e.g. ``emp0003``.
+    if lower.startswith("emp"):
+        return _NUMBER_TO_ID.get(lower[3:].lstrip("0"))
     return None
 
 
@@ -163,7 +182,7 @@ def _employee_ids_from_list_input(employee_ids_csv: str) -> tuple[list[str], lis
     raw = employee_ids_csv.strip()
     if not raw:
         return [], []
-    chunks = [c.strip() for c in re.split(r"[,;]+", raw) if c.strip()]
+    chunks = [c.strip() for c in raw.replace(";", ",").split(",") if c.strip()]
     resolved: list[str] = []
     unknown: list[str] = []
 
@@ -279,7 +298,7 @@ def apply_leave_for_employee(
         "leave_type": leave_type.strip() or "general",
         "status": "approved",
         "notes": notes.strip(),
-        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "created_at": _now_iso(),
     }
     _leaves.append(leave)
     _save_to_disk()
@@ -314,7 +333,7 @@ def revoke_leave(leave_id: str, employee_id: str = "") -> str:
         if lv.get("status") == "revoked":
             return json.dumps({"ok": False, "error": "already_revoked", "leave": lv}, indent=2)
         lv["status"] = "revoked"
-        lv["revoked_at"] = datetime.now().isoformat(timespec="seconds")
+        lv["revoked_at"] = _now_iso()
         _save_to_disk()
         eid = lv.get("employee_id", "")
         emp = EMPLOYEES.get(eid) if isinstance(eid, str) else None
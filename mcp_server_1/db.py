@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import os
 import sqlite3
+import threading
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -15,12 +17,31 @@ def db_path() -> Path:
     return Path(raw).expanduser() if raw else DEFAULT_DB_PATH
 
 
+# One long-lived connection per thread: reopening the file per tool call would drop the page cache every time.
+_tls = threading.local()
+
+
 def connect() -> sqlite3.Connection:
     path = db_path()
     path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(path)
-    conn.row_factory = sqlite3.Row
+    # Room for every fixed statement plus the IN-list variants of tasks_for_users.
+    conn = sqlite3.connect(path, cached_statements=256)
     conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA cache_size = -64000")
+    conn.execute("PRAGMA mmap_size = 268435456")
+    return conn
+
+
+def shared_connection() -> sqlite3.Connection:
+    """This thread's connection, opened (and its schema ensured) on first use and kept for the life of the process."""
+    conn = getattr(_tls, "conn", None)
+    if conn is None:
+        conn = connect()
+        init_schema(conn)
+        _tls.conn = conn
     return conn
 
 
@@ -44,35 +65,40 @@ def init_schema(conn: sqlite3.Connection) -> None:
 
         CREATE INDEX IF NOT EXISTS idx_tasks_user_id ON tasks(user_id);
         CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+        CREATE INDEX IF NOT EXISTS idx_tasks_user_status ON tasks(user_id, status);
         """
     )
 
 
-def row_to_dict(row: sqlite3.Row | None) -> dict[str, Any] | None:
+# Column order of every users / tasks SELECT and RETURNING below. Rows come back as plain tuples
+# and are zipped with these names, which is cheaper than building sqlite3.Row objects and copying them.
+USER_FIELDS = ("id", "name", "age", "gender")
+TASK_FIELDS = ("id", "user_id", "name", "description", "status")
+
+
+def row_to_dict(row: tuple | None, fields: tuple[str, ...]) -> dict[str, Any] | None:
     if row is None:
         return None
-    return dict(row)
+    return dict(zip(fields, row))
 
 
 def user_create(conn: sqlite3.Connection, name: str, age: int, gender: str) -> dict[str, Any]:
-    cur = conn.execute(
-        "INSERT INTO users (name, age, gender) VALUES (?, ?, ?)",
+    r = conn.execute(
+        "INSERT INTO users (name, age, gender) VALUES (?, ?, ?) RETURNING id, name, age, gender",
         (name.strip(), age, gender.strip()),
-    )
-    uid = int(cur.lastrowid)
-    r = conn.execute("SELECT * FROM users WHERE id = ?", (uid,)).fetchone()
+    ).fetchone()
     assert r is not None
-    return row_to_dict(r)  # type: ignore[return-value]
+    return row_to_dict(r, USER_FIELDS)  # type: ignore[return-value]
 
 
 def user_get(conn: sqlite3.Connection, user_id: int) -> dict[str, Any] | None:
-    r = conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
-    return row_to_dict(r)
+    r = conn.execute("SELECT id, name, age, gender FROM users WHERE id = ?", (user_id,)).fetchone()
+    return row_to_dict(r, USER_FIELDS)
 
 
 def user_list(conn: sqlite3.Connection) -> list[dict[str, Any]]:
-    rows = conn.execute("SELECT * FROM users ORDER BY id").fetchall()
-    return [dict(x) for x in rows]
+    rows = conn.execute("SELECT id, name, age, gender FROM users ORDER BY id").fetchall()
+    return [dict(zip(USER_FIELDS, x)) for x in rows]
 
 
 def user_update(
@@ -83,17 +109,18 @@ def user_update(
     age: int | None = None,
     gender: str | None = None,
 ) -> dict[str, Any] | None:
-    existing = user_get(conn, user_id)
-    if not existing:
-        return None
-    new_name = name.strip() if name is not None else existing["name"]
-    new_age = age if age is not None else existing["age"]
-    new_gender = gender.strip() if gender is not None else existing["gender"]
-    conn.execute(
-        "UPDATE users SET name = ?, age = ?, gender = ? WHERE id = ?",
-        (new_name, new_age, new_gender, user_id),
-    )
-    return user_get(conn, user_id)
+    # NULL parameters keep the current column value; RETURNING gives the post-image in the same statement.
+    r = conn.execute(
+        "UPDATE users SET name = COALESCE(?, name), age = COALESCE(?, age), gender = COALESCE(?, gender) "
+        "WHERE id = ? RETURNING id, name, age, gender",
+        (
+            name.strip() if name is not None else None,
+            age,
+            gender.strip() if gender is not None else None,
+            user_id,
+        ),
+    ).fetchone()
+    return row_to_dict(r, USER_FIELDS)
 
 
 def user_delete(conn: sqlite3.Connection, user_id: int) -> bool:
@@ -110,30 +137,48 @@ def task_create(
 ) -> dict[str, Any] | None:
     if user_get(conn, user_id) is None:
         return None
-    cur = conn.execute(
-        "INSERT INTO tasks (user_id, name, description, status) VALUES (?, ?, ?, ?)",
+    r = conn.execute(
+        "INSERT INTO tasks (user_id, name, description, status) VALUES (?, ?, ?, ?) RETURNING id, user_id, name, description, status",
         (user_id, name.strip(), description.strip(), status.strip() or "pending"),
-    )
-    tid = int(cur.lastrowid)
-    r = conn.execute("SELECT * FROM tasks WHERE id = ?", (tid,)).fetchone()
+    ).fetchone()
     assert r is not None
-    return row_to_dict(r)  # type: ignore[return-value]
+    return row_to_dict(r, TASK_FIELDS)  # type: ignore[return-value]
+
+
+def tasks_create(
+    conn: sqlite3.Connection,
+    user_id: int,
+    names: list[str],
+    status: str = "pending",
+) -> list[dict[str, Any]] | None:
+    """Create several tasks for one user; the caller's transaction covers all of them (one commit)."""
+    if user_get(conn, user_id) is None:
+        return None
+    st = status.strip() or "pending"
+    out: list[dict[str, Any]] = []
+    for name in names:
+        r = conn.execute(
+            "INSERT INTO tasks (user_id, name, description, status) VALUES (?, ?, ?, ?) RETURNING id, user_id, name, description, status",
+            (user_id, name.strip(), "", st),
+        ).fetchone()
+        out.append(row_to_dict(r, TASK_FIELDS))  # type: ignore[arg-type]
+    return out
 
 
 def task_get(conn: sqlite3.Connection, task_id: int) -> dict[str, Any] | None:
-    r = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
-    return row_to_dict(r)
+    r = conn.execute("SELECT id, user_id, name, description, status FROM tasks WHERE id = ?", (task_id,)).fetchone()
+    return row_to_dict(r, TASK_FIELDS)
 
 
 def task_list(conn: sqlite3.Connection, user_id: int | None = None) -> list[dict[str, Any]]:
     if user_id is None:
-        rows = conn.execute("SELECT * FROM tasks ORDER BY id").fetchall()
+        rows = conn.execute("SELECT id, user_id, name, description, status FROM tasks ORDER BY id").fetchall()
     else:
         rows = conn.execute(
-            "SELECT * FROM tasks WHERE user_id = ? ORDER BY id",
+            "SELECT id, user_id, name, description, status FROM tasks WHERE user_id = ? ORDER BY id",
             (user_id,),
         ).fetchall()
-    return [dict(x) for x in rows]
+    return [dict(zip(TASK_FIELDS, x)) for x in rows]
 
 
 def task_update(
@@ -145,20 +190,22 @@ def task_update(
     status: str | None = None,
     user_id: int | None = None,
 ) -> dict[str, Any] | None:
-    existing = task_get(conn, task_id)
-    if not existing:
+    if user_id is not None and user_get(conn, user_id) is None:
         return None
-    new_user = user_id if user_id is not None else existing["user_id"]
-    if user_get(conn, int(new_user)) is None:
-        return None
-    new_name = name.strip() if name is not None else existing["name"]
-    new_desc = description.strip() if description is not None else existing["description"]
-    new_status = status.strip() if status is not None else existing["status"]
-    conn.execute(
-        "UPDATE tasks SET user_id = ?, name = ?, description = ?, status = ? WHERE id = ?",
-        (new_user, new_name, new_desc, new_status or "pending", task_id),
-    )
-    return task_get(conn, task_id)
+    # NULL parameters keep the current column value; an empty status becomes 'pending'.
+    r = conn.execute(
+        "UPDATE tasks SET user_id = COALESCE(?, user_id), name = COALESCE(?, name), "
+        "description = COALESCE(?, description), status = COALESCE(NULLIF(COALESCE(?, status), ''), 'pending') "
+        "WHERE id = ? RETURNING id, user_id, name, description, status",
+        (
+            user_id,
+            name.strip() if name is not None else None,
+            description.strip() if description is not None else None,
+            status.strip() if status is not None else None,
+            task_id,
+        ),
+    ).fetchone()
+    return row_to_dict(r, TASK_FIELDS)
 
 
 def task_delete(conn: sqlite3.Connection, task_id: int) -> bool:
@@ -166,6 +213,16 @@ def task_delete(conn: sqlite3.Connection, task_id: int) -> bool:
     return cur.rowcount > 0
 
 
+@lru_cache(maxsize=64)
+def _tasks_for_users_sql(n_ids: int, with_status: bool) -> str:
+    """Same text for the same shape, so the connection's statement cache can reuse the prepared query."""
+    placeholders = ",".join("?" * n_ids)
+    sql = f"SELECT id, user_id, name, description, status FROM tasks WHERE user_id IN ({placeholders})"
+    if with_status:
+        sql += " AND status = ?"
+    return sql + " ORDER BY user_id, id"
+
+
 def tasks_for_users(
     conn: sqlite3.Connection,
     user_ids: list[int],
@@ -173,18 +230,13 @@ def tasks_for_users(
 ) -> dict[int, list[dict[str, Any]]]:
     if not user_ids:
         return {}
-    placeholders = ",".join("?" * len(user_ids))
-    params: list[Any] = list(user_ids)
-    sql = f"SELECT * FROM tasks WHERE user_id IN ({placeholders})"
-    if status is not None and status.strip():
-        sql += " AND status = ?"
-        params.append(status.strip())
-    sql += " ORDER BY user_id, id"
-    rows = conn.execute(sql, params).fetchall()
     out: dict[int, list[dict[str, Any]]] = {uid: [] for uid in user_ids}
-    for row in rows:
-        d = dict(row)
-        uid = int(d["user_id"])
-        if uid in out:
-            out[uid].append(d)
+    params: list[Any] = list(out)
+    st = status.strip() if status is not None else ""
+    if st:
+        params.append(st)
+    sql = _tasks_for_users_sql(len(out), bool(st))
+    # The IN/status filter runs in SQLite, so every row belongs to a requested user.
+    for row in conn.execute(sql, params):
+        out[row[1]].append(dict(zip(TASK_FIELDS, row)))
     return out
@@ -44,6 +44,7 @@ Rules:
 - Always use tools to read or change data; do not invent users or tasks.
 - Tool responses are JSON strings; parse them to know ids and errors.
 - For get_tasks_for_users, pass user_ids as a comma-separated list of integer user ids (e.g. "1,2"). Pass status as empty string to include all statuses, or a specific status to filter.
+- For create_tasks, pass names with one task name per line; use it instead of repeated create_task calls when adding several tasks for the same user.
 - For list_tasks, omit user_id only when listing all tasks; pass user_id as an integer to filter.
 - For update_user and update_task, omit optional fields you are not changing (do not send null unless the schema allows it).
 
@@ -159,8 +160,7 @@ async def _input_line(prompt: str) -> str | None:
         except EOFError:
             return None
 
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, _read)
+    return await asyncio.to_thread(_read)
 
 
 async def run_interactive(
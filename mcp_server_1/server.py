@@ -15,7 +15,6 @@ from __future__ import annotations
 import json
 import logging
 import os
-import re
 import sys
 from pathlib import Path
 from typing import Any
@@ -24,6 +23,11 @@ from mcp.server.fastmcp import FastMCP
 
 import db as dbmod
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 mcp = FastMCP("Users and Tasks")
 
 _LOG = logging.getLogger("users_tasks_mcp")
@@ -70,10 +74,15 @@ def _log_tool(tool_name: str, **params: Any) -> None:
     _flush_log_handlers()
 
 
+def _dumps(obj: Any) -> str:
+    """Pretty JSON for tool responses (orjson when installed, stdlib json otherwise)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
 def _with_conn() -> Any:
-    conn = dbmod.connect()
-    dbmod.init_schema(conn)
-    return conn
+    return dbmod.shared_connection()
 
 
 def _parse_int_ids(csv: str) -> tuple[list[int], list[str]]:
@@ -81,7 +90,7 @@ def _parse_int_ids(csv: str) -> tuple[list[int], list[str]]:
     raw = csv.strip()
     if not raw:
         return [], []
-    chunks = [c.strip() for c in re.split(r"[,;]+", raw) if c.strip()]
+    chunks = [c.strip() for c in raw.replace(";", ",").split(",") if c.strip()]
     ids: list[int] = []
     bad: list[str] = []
     for c in chunks:
@@ -98,13 +107,11 @@ def create_user(name: str, age: int, gender: str) -> str:
     _log_tool("create_user", name=name, age=age, gender=gender)
     conn = _with_conn()
     try:
-        conn.execute("BEGIN")
-        row = dbmod.user_create(conn, name, age, gender)
-        conn.execute("COMMIT")
-        return json.dumps({"ok": True, "user": row}, indent=2)
+        with conn:
+            row = dbmod.user_create(conn, name, age, gender)
+        return _dumps({"ok": True, "user": row})
     except Exception as exc:  # noqa: BLE001
-        conn.execute("ROLLBACK")
-        return json.dumps({"ok": False, "error": str(exc)}, indent=2)
+        return _dumps({"ok": False, "error": str(exc)})
 
 
 @mcp.tool()
@@ -114,8 +121,8 @@ def get_user(user_id: int) -> str:
     conn = _with_conn()
     row = dbmod.user_get(conn, user_id)
     if not row:
-        return json.dumps({"ok": False, "error": "not_found", "user_id": user_id}, indent=2)
-    return json.dumps({"ok": True, "user": row}, indent=2)
+        return _dumps({"ok": False, "error": "not_found", "user_id": user_id})
+    return _dumps({"ok": True, "user": row})
 
 
 @mcp.tool()
@@ -124,7 +131,7 @@ def list_users() -> str:
     _log_tool("list_users")
     conn = _with_conn()
     rows = dbmod.user_list(conn)
-    return json.dumps({"ok": True, "users": rows}, indent=2)
+    return _dumps({"ok": True, "users": rows})
 
 
 @mcp.tool()
@@ -138,15 +145,13 @@ def update_user(
     _log_tool("update_user", user_id=user_id, name=name, age=age, gender=gender)
     conn = _with_conn()
     try:
-        conn.execute("BEGIN")
-        row = dbmod.user_update(conn, user_id, name=name, age=age, gender=gender)
-        conn.execute("COMMIT")
+        with conn:
+            row = dbmod.user_update(conn, user_id, name=name, age=age, gender=gender)
         if not row:
-            return json.dumps({"ok": False, "error": "not_found", "user_id": user_id}, indent=2)
-        return json.dumps({"ok": True, "user": row}, indent=2)
+            return _dumps({"ok": False, "error": "not_found", "user_id": user_id})
+        return _dumps({"ok": True, "user": row})
     except Exception as exc:  # noqa: BLE001
-        conn.execute("ROLLBACK")
-        return json.dumps({"ok": False, "error": str(exc)}, indent=2)
+        return _dumps({"ok": False, "error": str(exc)})
 
 
 @mcp.tool()
@@ -155,15 +160,13 @@ def delete_user(user_id: int) -> str:
     _log_tool("delete_user", user_id=user_id)
     conn = _with_conn()
     try:
-        conn.execute("BEGIN")
-        ok = dbmod.user_delete(conn, user_id)
-        conn.execute("COMMIT")
+        with conn:
+            ok = dbmod.user_delete(conn, user_id)
         if not ok:
-            return json.dumps({"ok": False, "error": "not_found", "user_id": user_id}, indent=2)
-        return json.dumps({"ok": True, "deleted_user_id": user_id}, indent=2)
+            return _dumps({"ok": False, "error": "not_found", "user_id": user_id})
+        return _dumps({"ok": True, "deleted_user_id": user_id})
     except Exception as exc:  # noqa: BLE001
-        conn.execute("ROLLBACK")
-        return json.dumps({"ok": False, "error": str(exc)}, indent=2)
+        return _dumps({"ok": False, "error": str(exc)})
 
 
 @mcp.tool()
@@ -172,15 +175,34 @@ def create_task(user_id: int, name: str, description: str = "", status: str = "p
     _log_tool("create_task", user_id=user_id, name=name, description=description, status=status)
     conn = _with_conn()
     try:
-        conn.execute("BEGIN")
-        row = dbmod.task_create(conn, user_id, name, description, status)
-        conn.execute("COMMIT")
+        with conn:
+            row = dbmod.task_create(conn, user_id, name, description, status)
         if not row:
-            return json.dumps({"ok": False, "error": "user_not_found", "user_id": user_id}, indent=2)
-        return json.dumps({"ok": True, "task": row}, indent=2)
+            return _dumps({"ok": False, "error": "user_not_found", "user_id": user_id})
+        return _dumps({"ok": True, "task": row})
+    except Exception as exc:  # noqa: BLE001
+        return _dumps({"ok": False, "error": str(exc)})
+
+
+@mcp.tool()
+def create_tasks(user_id: int, names: str, status: str = "pending") -> str:
+    """
+    Create several tasks for ``user_id`` in one call. ``names`` holds one task name per line
+    (semicolons also separate). All tasks get ``status`` (default ``pending``) and an empty description.
+    """
+    _log_tool("create_tasks", user_id=user_id, names=names, status=status)
+    task_names = [n.strip() for n in names.replace(";", "\n").splitlines() if n.strip()]
+    if not task_names:
+        return _dumps({"ok": False, "error": "no_task_names"})
+    conn = _with_conn()
+    try:
+        with conn:
+            rows = dbmod.tasks_create(conn, user_id, task_names, status)
+        if rows is None:
+            return _dumps({"ok": False, "error": "user_not_found", "user_id": user_id})
+        return _dumps({"ok": True, "tasks": rows})
     except Exception as exc:  # noqa: BLE001
-        conn.execute("ROLLBACK")
-        return json.dumps({"ok": False, "error": str(exc)}, indent=2)
+        return _dumps({"ok": False, "error": str(exc)})
 
 
 @mcp.tool()
@@ -190,8 +212,8 @@ def get_task(task_id: int) -> str:
     conn = _with_conn()
     row = dbmod.task_get(conn, task_id)
     if not row:
-        return json.dumps({"ok": False, "error": "not_found", "task_id": task_id}, indent=2)
-    return json.dumps({"ok": True, "task": row}, indent=2)
+        return _dumps({"ok": False, "error": "not_found", "task_id": task_id})
+    return _dumps({"ok": True, "task": row})
 
 
 @mcp.tool()
@@ -200,7 +222,7 @@ def list_tasks(user_id: int | None = None) -> str:
     _log_tool("list_tasks", user_id=user_id)
     conn = _with_conn()
     rows = dbmod.task_list(conn, user_id)
-    return json.dumps({"ok": True, "tasks": rows}, indent=2)
+    return _dumps({"ok": True, "tasks": rows})
 
 
 @mcp.tool()
@@ -222,27 +244,23 @@ def update_task(
     )
     conn = _with_conn()
     try:
-        conn.execute("BEGIN")
-        if not dbmod.task_get(conn, task_id):
-            conn.execute("ROLLBACK")
-            return json.dumps({"ok": False, "error": "task_not_found", "task_id": task_id}, indent=2)
-        if user_id is not None and not dbmod.user_get(conn, user_id):
-            conn.execute("ROLLBACK")
-            return json.dumps({"ok": False, "error": "user_not_found", "user_id": user_id}, indent=2)
-        row = dbmod.task_update(
-            conn,
-            task_id,
-            name=name,
-            description=description,
-            status=status,
-            user_id=user_id,
-        )
-        conn.execute("COMMIT")
+        with conn:
+            if not dbmod.task_get(conn, task_id):
+                return _dumps({"ok": False, "error": "task_not_found", "task_id": task_id})
+            if user_id is not None and not dbmod.user_get(conn, user_id):
+                return _dumps({"ok": False, "error": "user_not_found", "user_id": user_id})
+            row = dbmod.task_update(
+                conn,
+                task_id,
+                name=name,
+                description=description,
+                status=status,
+                user_id=user_id,
+            )
         assert row is not None
-        return json.dumps({"ok": True, "task": row}, indent=2)
+        return _dumps({"ok": True, "task": row})
     except Exception as exc:  # noqa: BLE001
-        conn.execute("ROLLBACK")
-        return json.dumps({"ok": False, "error": str(exc)}, indent=2)
+        return _dumps({"ok": False, "error": str(exc)})
 
 
 @mcp.tool()
@@ -251,15 +269,13 @@ def delete_task(task_id: int) -> str:
     _log_tool("delete_task", task_id=task_id)
     conn = _with_conn()
     try:
-        conn.execute("BEGIN")
-        ok = dbmod.task_delete(conn, task_id)
-        conn.execute("COMMIT")
+        with conn:
+            ok = dbmod.task_delete(conn, task_id)
         if not ok:
-            return json.dumps({"ok": False, "error": "not_found", "task_id": task_id}, indent=2)
-        return json.dumps({"ok": True, "deleted_task_id": task_id}, indent=2)
+            return _dumps({"ok": False, "error": "not_found", "task_id": task_id})
+        return _dumps({"ok": True, "deleted_task_id": task_id})
     except Exception as exc:  # noqa: BLE001
-        conn.execute("ROLLBACK")
-        return json.dumps({"ok": False, "error": str(exc)}, indent=2)
+        return _dumps({"ok": False, "error": str(exc)})
 
 
 @mcp.tool()
@@ -272,10 +288,7 @@ def get_tasks_for_users(user_ids: str, status: str = "") -> str:
     conn = _with_conn()
     ids, bad = _parse_int_ids(user_ids)
     if bad and not ids:
-        return json.dumps(
-            {"ok": False, "error": "no_valid_user_ids", "unknown_tokens": bad},
-            indent=2,
-        )
+        return _dumps({"ok": False, "error": "no_valid_user_ids", "unknown_tokens": bad})
     st = status.strip() or None
     by_user = dbmod.tasks_for_users(conn, ids, status=st)
     payload = {
@@ -284,15 +297,15 @@ def get_tasks_for_users(user_ids: str, status: str = "") -> str:
     }
     if bad:
         payload["skipped_tokens"] = bad
-    return json.dumps(payload, indent=2)
+    return _dumps(payload)
 
 
 def main() -> None:
     _ensure_logging()
     conn = _with_conn()
-    n_users = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
-    n_tasks = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
-    conn.close()
+    n_users, n_tasks = conn.execute(
+        "SELECT (SELECT COUNT(*) FROM users), (SELECT COUNT(*) FROM tasks)"
+    ).fetchone()
     _LOG.info(
         "users_tasks_mcp starting (stdio MCP) db=%s users=%s tasks=%s",
         dbmod.db_path(),
@@ -12,13 +12,12 @@ Env ``VECTOR_MCP_EMBED_MODEL`` (default ``embeddinggemma``). Stdio MCP reserves
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import os
 import sqlite3
 import sys
-from contextlib import redirect_stdout
-from io import StringIO
 from pathlib import Path
 from typing import Any
 
@@ -26,6 +25,11 @@ from mcp.server.fastmcp import FastMCP
 
 import vector_store as vs
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 mcp = FastMCP("Folder vector index")
 
 _LOG = logging.getLogger("vector_mcp")
@@ -63,14 +67,24 @@ def _flush_log_handlers() -> None:
             pass
 
 
+def _dumps(obj: Any) -> str:
+    """Pretty JSON for tool responses (orjson when installed, stdlib json otherwise)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
 def _log_tool(tool_name: str, **params: Any) -> None:
     _ensure_logging()
     _LOG.info("tool_call %s %s", tool_name, json.dumps(params, default=str, sort_keys=True))
     _flush_log_handlers()
 
 
+# Tools are async and run the blocking store work (SQLite, Ollama embeddings) in worker threads so the event
+# loop keeps reading requests. vector_store takes its SQLite locks per write (not across embedding) and does
+# not print; its one stdout redirect (pypdf) is lock-guarded, so the tools never swap ``sys.stdout`` per call.
 @mcp.tool()
-def index_folder(
+async def index_folder(
     folder_path: str,
     glob_pattern: str = "**/*",
     extensions: str = ".txt,.md,.py,.json,.yaml,.yml,.rst,.pdf",
@@ -91,21 +105,21 @@ def index_folder(
         chunk_overlap=chunk_overlap,
     )
     try:
-        with redirect_stdout(StringIO()):
-            out = vs.index_folder(
-                folder_path,
-                glob_pattern=glob_pattern,
-                extensions_csv=extensions,
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap,
-            )
-        return json.dumps(out, indent=2)
+        out = await asyncio.to_thread(
+            vs.index_folder,
+            folder_path,
+            glob_pattern=glob_pattern,
+            extensions_csv=extensions,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+        )
+        return _dumps(out)
     except Exception as exc:  # noqa: BLE001
-        return json.dumps({"ok": False, "error": str(exc)}, indent=2)
+        return _dumps({"ok": False, "error": str(exc)})
 
 
 @mcp.tool()
-def refresh_vector_db(chunk_size: int = 1200, chunk_overlap: int = 200) -> str:
+async def refresh_vector_db(chunk_size: int = 1200, chunk_overlap: int = 200) -> str:
     """
     Rebuild the vector index for all PDFs under the bundled ``pdfs`` folder (inside mcp_server_2).
     Removes prior chunks from that folder, then re-embeds every ``*.pdf`` found there.
@@ -113,42 +127,41 @@ def refresh_vector_db(chunk_size: int = 1200, chunk_overlap: int = 200) -> str:
     _log_tool("refresh_vector_db", chunk_size=chunk_size, chunk_overlap=chunk_overlap)
     try:
         # Same entry as manual_refresh_pdfs.py (avoid extra stdout wrapper; MCP JSON-RPC stays on stdout only).
-        out = vs.refresh_vector_db(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-        return json.dumps(out, indent=2)
+        out = await asyncio.to_thread(vs.refresh_vector_db, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        return _dumps(out)
     except Exception as exc:  # noqa: BLE001
-        return json.dumps({"ok": False, "error": str(exc)}, indent=2)
+        return _dumps({"ok": False, "error": str(exc)})
 
 
 @mcp.tool()
-def clear_vector_index() -> str:
+async def clear_vector_index() -> str:
     """Remove all chunks and metadata from the vector index."""
     _log_tool("clear_vector_index")
     try:
-        return json.dumps(vs.clear_index(), indent=2)
+        return _dumps(await asyncio.to_thread(vs.clear_index))
     except Exception as exc:  # noqa: BLE001
-        return json.dumps({"ok": False, "error": str(exc)}, indent=2)
+        return _dumps({"ok": False, "error": str(exc)})
 
 
 @mcp.tool()
-def query_vectors(query: str, top_k: int = 5) -> str:
+async def query_vectors(query: str, top_k: int = 5) -> str:
     """Embed ``query`` and return the top_k most similar chunks (text excerpts + scores)."""
     _log_tool("query_vectors", query=query[:200], top_k=top_k)
     try:
-        with redirect_stdout(StringIO()):
-            out = vs.query_similar(query, top_k=top_k)
-        return json.dumps(out, indent=2)
+        out = await asyncio.to_thread(vs.query_similar, query, top_k=top_k)
+        return _dumps(out)
     except Exception as exc:  # noqa: BLE001
-        return json.dumps({"ok": False, "error": str(exc)}, indent=2)
+        return _dumps({"ok": False, "error": str(exc)})
 
 
 @mcp.tool()
-def vector_index_stats() -> str:
+async def vector_index_stats() -> str:
     """Counts, ``file_count``, and ``source_paths`` (every indexed file path, sorted)."""
     _log_tool("vector_index_stats")
     try:
-        return json.dumps(vs.index_stats(), indent=2)
+        return _dumps(await asyncio.to_thread(vs.index_stats))
     except Exception as exc:  # noqa: BLE001
-        return json.dumps({"ok": False, "error": str(exc)}, indent=2)
+        return _dumps({"ok": False, "error": str(exc)})
 
 
 def _maybe_startup_refresh() -> None:
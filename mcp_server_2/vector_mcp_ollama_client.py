@@ -149,8 +149,7 @@ async def _input_line(prompt: str) -> str | None:
         except EOFError:
             return None
 
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, _read)
+    return await asyncio.to_thread(_read)
 
 
 async def run_interactive(
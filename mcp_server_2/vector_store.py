@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import array
 import contextlib
+import heapq
 import io
 import json
 import logging
@@ -13,6 +15,7 @@ import subprocess
 import threading
 import time
 from collections.abc import Iterator
+from operator import itemgetter
 from pathlib import Path
 from typing import Any
 
@@ -31,6 +34,8 @@ _LOG = logging.getLogger("vector_mcp")
 
 # Serialize all SQLite use in this process (MCP may call tools from different threads).
 _SQLITE_THREAD_LOCK = threading.RLock()
+# ``redirect_stdout`` swaps the process-wide ``sys.stdout``; hold this across swap *and* restore.
+_STDOUT_REDIRECT_LOCK = threading.Lock()
 
 
 def _flush_vector_mcp_handlers() -> None:
@@ -153,7 +158,7 @@ def serialized_sqlite_writes() -> Iterator[None]:
     """
     Serialize SQLite-mutating sections across processes (e.g. two MCP server instances).
 
-    Same-process nested calls only take the flock once (``refresh_vector_db`` → ``index_folder``).
+    Same-process nested calls only take the flock once.
     Without ``fcntl`` (Windows), this is a no-op.
     """
     with sqlite_mutex("serialized_sqlite_writes"):
@@ -237,10 +242,26 @@ def connect(*, lite: bool = False) -> sqlite3.Connection:
         conn.execute("PRAGMA journal_mode=WAL")
     except sqlite3.OperationalError:
         pass
+    # query_similar reads every embedding on each call: map the file so reads come from the OS page
+    # cache, which outlives this per-call connection (a larger SQLite cache_size would not).
+    conn.execute("PRAGMA mmap_size = 268435456")
     return conn
 
 
+# db path -> PRAGMA schema_version right after init_schema last ran; any DDL (from any process)
+# or a recreated file changes the version, so the CREATE script only reruns when needed.
+_SCHEMA_VERSIONS: dict[str, int] = {}
+
+
+def _schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA schema_version").fetchone()[0]
+
+
 def init_schema(conn: sqlite3.Connection) -> None:
+    key = str(db_path())
+    seen = _SCHEMA_VERSIONS.get(key)
+    if seen is not None and _schema_version(conn) == seen:
+        return
     conn.executescript(
         """
         CREATE TABLE IF NOT EXISTS meta (
@@ -260,18 +281,43 @@ def init_schema(conn: sqlite3.Connection) -> None:
         CREATE INDEX IF NOT EXISTS idx_chunks_path ON chunks(source_path);
         """
     )
+    _SCHEMA_VERSIONS[key] = _schema_version(conn)
+
+
+def _pack_embedding(vec: list[float]) -> bytes:
+    """Embeddings are stored as raw float64 BLOBs (the column keeps its historical name and TEXT
+    affinity, which leaves BLOBs untouched): about half the size of the JSON text and no parsing on read."""
+    return array.array("d", vec).tobytes()
 
 
-def _set_meta(conn: sqlite3.Connection, key: str, value: str) -> None:
-    conn.execute(
+def _unpack_embedding(value: bytes | str) -> list[float]:
+    """Decode an ``embedding_json`` cell; rows written before the BLOB format still hold JSON text."""
+    if isinstance(value, bytes):
+        emb = array.array("d")
+        emb.frombytes(value)
+        return emb.tolist()
+    emb = json.loads(value)
+    if not isinstance(emb, list):
+        raise TypeError("embedding is not a list")
+    return [float(x) for x in emb]
+
+
+def _set_meta(conn: sqlite3.Connection, **values: str) -> None:
+    """Upsert several meta keys with one prepared statement."""
+    conn.executemany(
         "INSERT INTO meta(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
-        (key, value),
+        values.items(),
     )
 
 
-def _get_meta(conn: sqlite3.Connection, key: str) -> str | None:
-    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
-    return row[0] if row else None
+def _get_meta(conn: sqlite3.Connection, *keys: str) -> dict[str, str | None]:
+    """Values for ``keys`` (``None`` when unset), read in one query."""
+    found = dict(
+        conn.execute(
+            f"SELECT key, value FROM meta WHERE key IN ({','.join('?' * len(keys))})", keys
+        ).fetchall()
+    )
+    return {k: found.get(k) for k in keys}
 
 
 def fetch_embedding(client: httpx.Client, text: str) -> list[float]:
@@ -279,21 +325,19 @@ def fetch_embedding(client: httpx.Client, text: str) -> list[float]:
     base = ollama_base().rstrip("/")
     model = embed_model()
 
-    buf = io.StringIO()
-    with contextlib.redirect_stdout(buf):
+    r = client.post(
+        f"{base}/api/embed",
+        json={"model": model, "input": text},
+        timeout=120.0,
+    )
+    if r.status_code == 404:
         r = client.post(
-            f"{base}/api/embed",
-            json={"model": model, "input": text},
+            f"{base}/api/embeddings",
+            json={"model": model, "prompt": text},
             timeout=120.0,
         )
-        if r.status_code == 404:
-            r = client.post(
-                f"{base}/api/embeddings",
-                json={"model": model, "prompt": text},
-                timeout=120.0,
-            )
-        r.raise_for_status()
-        data = r.json()
+    r.raise_for_status()
+    data = r.json()
 
     embs = data.get("embeddings")
     if isinstance(embs, list) and embs:
@@ -308,19 +352,25 @@ def fetch_embedding(client: httpx.Client, text: str) -> list[float]:
     raise RuntimeError(f"Unexpected embedding response: {data!r}")
 
 
-def cosine_similarity(a: list[float], b: list[float]) -> float:
-    if len(a) != len(b):
-        return -1.0
-    dot = 0.0
-    na = 0.0
-    nb = 0.0
-    for x, y in zip(a, b):
-        dot += x * y
-        na += x * x
-        nb += y * y
-    if na <= 0.0 or nb <= 0.0:
-        return 0.0
-    return dot / (math.sqrt(na) * math.sqrt(nb))
+def _query_scorer(q: list[float]):
+    """Cosine similarity to ``q`` (-1.0 on a dimension mismatch), with the query's norm computed once."""
+    q_norm = math.sqrt(sum(x * x for x in q))
+    dim = len(q)
+    sqrt = math.sqrt
+
+    def score(b: list[float]) -> float:
+        if len(b) != dim:
+            return -1.0
+        dot = 0.0
+        nb = 0.0
+        for x, y in zip(q, b):
+            dot += x * y
+            nb += y * y
+        if q_norm <= 0.0 or nb <= 0.0:
+            return 0.0
+        return dot / (q_norm * sqrt(nb))
+
+    return score
 
 
 def chunk_text(text: str, chunk_size: int, overlap: int) -> list[str]:
@@ -380,7 +430,7 @@ def extract_pdf_text(path: Path) -> str:
         raise RuntimeError("pypdf is not installed; pip install pypdf")
 
     buf = io.StringIO()
-    with contextlib.redirect_stdout(buf):
+    with _STDOUT_REDIRECT_LOCK, contextlib.redirect_stdout(buf):
         reader = PdfReader(str(path), strict=False)
         parts: list[str] = []
         for page in reader.pages:
@@ -418,7 +468,10 @@ def delete_chunks_under_directory(conn: sqlite3.Connection, folder: Path) -> int
     """Remove chunks under ``folder`` (resolved paths). Uses ``BEGIN IMMEDIATE`` and retries briefly on SQLITE_BUSY."""
     root = folder.resolve()
     prefix = str(root)
-    like = prefix + os.sep + "%"
+    # Paths under ``prefix`` sort between prefix + sep and prefix + the next character after sep, so the
+    # range can walk idx_chunks_path (a LIKE pattern forces a full scan; it also treats ``_`` as a wildcard).
+    lo = prefix + os.sep
+    hi = prefix + chr(ord(os.sep) + 1)
 
     del_busy_ms = int(os.environ.get("VECTOR_MCP_SQLITE_DELETE_BUSY_MS", "6000").strip() or "6000")
     if del_busy_ms < 500:
@@ -437,8 +490,8 @@ def delete_chunks_under_directory(conn: sqlite3.Connection, folder: Path) -> int
             conn.execute("BEGIN IMMEDIATE")
             try:
                 cur = conn.execute(
-                    "DELETE FROM chunks WHERE source_path = ? OR source_path LIKE ?",
-                    (prefix, like),
+                    "DELETE FROM chunks WHERE source_path = ? OR (source_path >= ? AND source_path < ?)",
+                    (prefix, lo, hi),
                 )
                 rowcount = cur.rowcount
                 conn.commit()
@@ -448,7 +501,8 @@ def delete_chunks_under_directory(conn: sqlite3.Connection, folder: Path) -> int
                 raise
         except sqlite3.OperationalError as exc:
             last_exc = exc
-            if "locked" not in str(exc).lower() and "busy" not in str(exc).lower():
+            msg = str(exc).lower()
+            if "locked" not in msg and "busy" not in msg:
                 raise
             _LOG.warning(
                 "sqlite_delete_busy_retry attempt=%s/%s db=%s %s err=%s",
@@ -498,14 +552,14 @@ def index_folder(
     with serialized_sqlite_writes():
         conn = connect()
         init_schema(conn)
-        _set_meta(conn, "embed_model", embed_model())
-        _set_meta(conn, "ollama_base", ollama_base())
-        conn.commit()
+        with conn:
+            _set_meta(conn, embed_model=embed_model(), ollama_base=ollama_base())
 
-        indexed_files = 0
-        total_chunks = 0
-        errors: list[str] = []
+    indexed_files = 0
+    total_chunks = 0
+    errors: list[str] = []
 
+    try:
         with httpx.Client() as client:
             for fp in files:
                 rel = str(fp.resolve())
@@ -516,27 +570,27 @@ def index_folder(
                 if body is None:
                     continue
 
-                conn.execute("DELETE FROM chunks WHERE source_path = ?", (rel,))
                 pieces = chunk_text(body, chunk_size, chunk_overlap) if body.strip() else []
-                if not pieces:
-                    conn.commit()
-                    indexed_files += 1
-                    continue
-
-                try:
-                    for i, piece in enumerate(pieces):
-                        emb = fetch_embedding(client, piece)
-                        conn.execute(
+                # Embed outside the write locks: Ollama is the slow part, and queries / stats (same
+                # in-process lock) and other writers (file lock) can run between files.
+                rows = [
+                    (rel, i, piece, _pack_embedding(fetch_embedding(client, piece)))
+                    for i, piece in enumerate(pieces)
+                ]
+                with serialized_sqlite_writes():
+                    try:
+                        conn.execute("DELETE FROM chunks WHERE source_path = ?", (rel,))
+                        conn.executemany(
                             "INSERT INTO chunks(source_path, chunk_index, text, embedding_json) VALUES (?,?,?,?)",
-                            (rel, i, piece, json.dumps(emb)),
+                            rows,
                         )
-                        total_chunks += 1
-                    conn.commit()
-                except Exception:
-                    conn.rollback()
-                    raise
+                        conn.commit()
+                    except Exception:
+                        conn.rollback()
+                        raise
+                total_chunks += len(rows)
                 indexed_files += 1
-
+    finally:
         conn.close()
     return {
         "ok": True,
@@ -582,13 +636,14 @@ def refresh_vector_db(
             removed = delete_chunks_under_directory(conn, pdf_root)
             conn.close()
 
-            out = index_folder(
-                str(pdf_root),
-                glob_pattern="**/*.pdf",
-                extensions_csv=".pdf",
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap,
-            )
+        # index_folder takes the write locks per file, so embedding does not hold them.
+        out = index_folder(
+            str(pdf_root),
+            glob_pattern="**/*.pdf",
+            extensions_csv=".pdf",
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+        )
         out["refresh"] = True
         out["pdfs_dir"] = str(resolved)
         out["chunks_removed_before_refresh"] = removed
@@ -633,21 +688,19 @@ def index_stats(*, lite: bool = True) -> dict[str, Any]:
     with sqlite_mutex("index_stats"):
         conn = connect(lite=lite)
         init_schema(conn)
-        n_chunks = conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
-        n_files = conn.execute("SELECT COUNT(DISTINCT source_path) FROM chunks").fetchone()[0]
-        model = _get_meta(conn, "embed_model")
-        base = _get_meta(conn, "ollama_base")
-        paths = conn.execute(
-            "SELECT DISTINCT source_path FROM chunks ORDER BY source_path"
+        # One grouped scan yields the sorted paths and both counts.
+        per_path = conn.execute(
+            "SELECT source_path, COUNT(*) FROM chunks GROUP BY source_path ORDER BY source_path"
         ).fetchall()
+        meta = _get_meta(conn, "embed_model", "ollama_base")
         conn.close()
-    sorted_paths = [r[0] for r in paths]
+    sorted_paths = [r[0] for r in per_path]
     return {
         "ok": True,
-        "chunk_count": n_chunks,
-        "file_count": n_files,
-        "embed_model": model,
-        "ollama_base_recorded": base,
+        "chunk_count": sum(r[1] for r in per_path),
+        "file_count": len(sorted_paths),
+        "embed_model": meta["embed_model"],
+        "ollama_base_recorded": meta["ollama_base"],
         "source_paths": sorted_paths,
         # Back-compat: historically only 8 rows; callers should use ``source_paths``.
         "sample_paths": sorted_paths,
@@ -670,28 +723,23 @@ def query_similar(query: str, top_k: int = 5) -> dict[str, Any]:
     with httpx.Client() as client:
         q_emb = fetch_embedding(client, query)
 
-    scored: list[tuple[float, dict[str, Any]]] = []
+    score = _query_scorer(q_emb)
+    # Score every row but only build (and truncate the text of) the k result dicts.
+    scored: list[tuple[float, str, int, str]] = []
     for _id, path, idx, text, emb_json in rows:
         try:
-            emb = json.loads(emb_json)
-            if not isinstance(emb, list):
-                continue
-            vec = [float(x) for x in emb]
+            vec = _unpack_embedding(emb_json)
         except (json.JSONDecodeError, TypeError, ValueError):
             continue
-        sim = cosine_similarity(q_emb, vec)
-        scored.append(
-            (
-                sim,
-                {
-                    "source_path": path,
-                    "chunk_index": idx,
-                    "score": round(sim, 6),
-                    "text": text[:2000] + ("…" if len(text) > 2000 else ""),
-                },
-            )
-        )
-
-    scored.sort(key=lambda x: x[0], reverse=True)
-    matches = [item[1] for item in scored[:k]]
+        scored.append((score(vec), path, idx, text))
+
+    matches = [
+        {
+            "source_path": path,
+            "chunk_index": idx,
+            "score": round(sim, 6),
+            "text": text[:2000] + ("…" if len(text) > 2000 else ""),
+        }
+        for sim, path, idx, text in heapq.nlargest(k, scored, key=itemgetter(0))
+    ]
     return {"ok": True, "query": query, "top_k": k, "matches": matches}
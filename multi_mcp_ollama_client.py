@@ -55,6 +55,7 @@ Use the leave-* tools for applying, listing, revoking, or approving leaves.
 ## B) Users and tasks (users/tasks database tools)
 Users have integer id, name, age, gender. Tasks belong to a user (user_id) with id, name, description, status (e.g. pending, open, done).
 - get_tasks_for_users: pass user_ids as a comma-separated string of integer ids (e.g. "1,2"). Use status="" for all statuses, or a specific status to filter.
+- create_tasks: pass names with one task name per line; prefer it over repeated create_task calls for one user.
 - list_tasks: omit user_id for all tasks; pass user_id to filter one user.
 - update_user / update_task: omit optional fields you are not changing.
 
@@ -209,8 +210,7 @@ async def _input_line(prompt: str) -> str | None:
         except EOFError:
             return None
 
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, _read)
+    return await asyncio.to_thread(_read)
 
 
 async def run_multi_sessions(